@@ -1,9 +1,9 @@
 """
 TinyLogger: A lightweight, zero-setup decorator for logging ML experiments.
 """
-from .decorator import log_run
+from .decorator import disable, enable, log_run
 from .util import load_log
 
 __version__ = "1.1.1"
 
-__all__ = ["log_run", "load_log"]
\ No newline at end of file
+__all__ = ["log_run", "load_log", "disable", "enable"]
\ No newline at end of file
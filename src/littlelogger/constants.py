@@ -12,3 +12,16 @@ TIMESTAMP_FORMAT: str = "%Y-%m-%dT%H:%M:%SZ"
 
 # The number of decimal places to round the runtime to.
 RUNTIME_PRECISION: int = 6
+
+# Buffered logging: once this many bytes are waiting, they are written out right away.
+BUFFER_FLUSH_BYTES: int = 64 * 1024
+
+# Buffered logging: the longest time (in seconds) a line waits in the background thread's buffer.
+BUFFER_FLUSH_INTERVAL_SECONDS: float = 0.5
+
+# How often (in seconds) a writer checks that its open log file is still the one at the log file's path,
+# so that a log file that was deleted or rotated is created again.
+FILE_CHECK_INTERVAL_SECONDS: float = 1.0
+
+# If this environment variable is set to "1" when the package is imported, log_run doesn't wrap anything.
+DISABLE_ENV_VAR: str = "LITTLELOGGER_DISABLE"
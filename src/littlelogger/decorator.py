@@ -4,17 +4,79 @@ The core decorator logic
 
 import functools
 import inspect
+import itertools
 import json
+import os
+import textwrap
 import time
 import warnings
-from typing import Any, Callable, Dict
+from typing import Any, Callable, Dict, Optional, Tuple
 
-from .constants import DEFAULT_LOG_FILE, RUNTIME_PRECISION, TIMESTAMP_FORMAT
+from .constants import (
+    DEFAULT_LOG_FILE,
+    DISABLE_ENV_VAR,
+    RUNTIME_PRECISION,
+    TIMESTAMP_FORMAT,
+)
 from .exceptions import LoggerNonSerializableError, LoggerWriteError
+from .writer import flush_all, get_writer
+
+
+def _stdlib_dumps(value: Any) -> bytes:
+    """Encodes a value as JSON with the stdlib json module."""
+    return json.dumps(value).encode("utf-8")
+
+
+try:
+    # msgspec is an optional JSON encoder written in C. It returns bytes directly, and reusing
+    # a single Encoder avoids setting one up on every call.
+    import msgspec
+
+    _dumps: Callable[[Any], bytes] = msgspec.json.Encoder().encode
+
+except ImportError:  # pragma: no cover - depends on the environment
+    try:
+        # orjson is another optional, much faster JSON encoder that returns bytes directly.
+        import orjson
+
+        def _dumps(value: Any) -> bytes:
+            """Encodes a value as JSON with orjson."""
+            # orjson is a compiled module, so pylint can't see its members.
+            # pylint: disable=no-member
+            return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+
+    except ImportError:
+        _dumps = _stdlib_dumps
+
+
+# When True, log_run returns functions unchanged. Read once at import; see `disable` and `enable`.
+_disabled: bool = os.environ.get(DISABLE_ENV_VAR) == "1"
+
+
+def disable() -> None:
+    """
+    Turns logging off for every function decorated from now on.
+
+    Those functions are returned as they are, so they run with no overhead at all.
+    Functions that were already decorated keep logging.
+    """
+    global _disabled  # pylint: disable=global-statement
+    _disabled = True
+
+
+def enable() -> None:
+    """
+    Turns logging back on for every function decorated from now on.
+    """
+    global _disabled  # pylint: disable=global-statement
+    _disabled = False
 
 
 def _get_func_args(
-    func: Callable[..., Any], *args: Any, **kwargs: Any
+    func: Callable[..., Any],
+    sig: Optional[inspect.Signature],
+    args: Tuple[Any, ...],
+    kwargs: Dict[str, Any],
 ) -> Dict[str, Any]:
     """
     Figures out the names and values of all arguments passed to a function.
@@ -23,20 +85,23 @@ def _get_func_args(
     This function handles the logic of binding *args and **kwargs to the function signature.
 
     :param func: The function called.
+    :param sig: The signature of `func`, computed once at decoration time. None if it couldn't be inspected.
     :param args: The positional arguments passed to the function.
     :param kwargs: The keyword arguments passed to the function.
     :return: A dictionary of parameter names mapped to their values.
     """
     try:
         # Bind the positional and keyword arguments to the function signature
-        bound_args = inspect.signature(func).bind(*args, **kwargs)
+        bound_args = sig.bind(*args, **kwargs)
         # Fill in any default values for arguments that weren't provided.
         bound_args.apply_defaults()
-        # Arguments is an OrderedDict, we convert it into plain dict
-        return dict(bound_args.arguments)
+        # Arguments is already a dict (an OrderedDict on older Pythons), which the
+        # JSON encoders handle just the same, so there's no need to copy it.
+        return bound_args.arguments
     except Exception:
-        # This 'try...except' is a safety net. Some special functions (like ones built-in to C) can't be inspected.
-        # If that happens, we don't want to crash. We just log the arguments in a "raw" format.
+        # This 'try...except' is a safety net. Some special functions (like ones built-in to C) can't be inspected,
+        # in which case `sig` is None. If that happens, we don't want to crash.
+        # We just log the arguments in a "raw" format.
         warnings.warn(
             f"[LittleLogger Warning] Could not figure out argument names for "
             f"'{func.__name__}'. Logging them as raw '_args' and '_kwargs'.",
@@ -45,35 +110,280 @@ def _get_func_args(
         return {"_args": args, "_kwargs": kwargs}
 
 
-def _serialize_log_entry(entry: Dict[str, Any]) -> str:
+# Every name the generated wrappers use internally starts with this, so they can't clash with the user's parameters.
+_GENERATED_PREFIX = "_ll_"
+
+
+def _has_own_signature(func: Callable[..., Any]) -> bool:
     """
-    Converts a log entry dictionary into a JSONL-formatted string
+    Checks whether the signature of a function describes the parameters its own code accepts.
+
+    `inspect.signature` follows `__wrapped__` (set by `functools.wraps`) and respects `__signature__`,
+    so for a function wrapped by another decorator it can report parameters the outer function doesn't
+    accept, or miss ones it does (like a `retries=3` added by a retry decorator). A wrapper generated
+    from such a signature would reject valid calls, so we only generate one for plain functions.
+
+    :param func: The function to be decorated.
+    :return: True if the function's signature comes straight from its code.
+    """
+    return (
+        hasattr(func, "__code__")
+        and not hasattr(func, "__wrapped__")
+        and not hasattr(func, "__signature__")
+    )
 
-    JSON-Lines (.jsonl) format requires each log entry to be a single, valid JSON object, followed by a newline.
-    This function enforces that.
 
-    :param entry: The dictionary containing log data.
-    :return: A JSON string ending with a newline.
+def _make_fast_wrapper(
+    func: Callable[..., Any],
+    sig: Optional[inspect.Signature],
+    log_call: Callable[[Dict[str, Any], Any, float, int], None],
+) -> Optional[Callable[..., Any]]:
     """
+    Generates a wrapper with exactly the same parameters as the decorated function.
+
+    A generic `wrapper(*args, **kwargs)` has to bind the arguments to the signature on every call
+    (`Signature.bind` is slow). If the wrapper is instead defined as `def wrapper(a, b=10): ...`,
+    the interpreter does the binding for us, and the params dictionary is just `{"a": a, "b": b}`.
+    The source for that wrapper is generated and compiled once, when the function is decorated.
+
+    :param func: The function to be decorated.
+    :param sig: The signature of `func`. None if it couldn't be inspected, or doesn't come from `func`'s own code.
+    :param log_call: Called with the params, the result, the start time and the runtime once the function returns.
+    :return: The generated wrapper, or None if one can't be generated for this signature.
+    """
+    if sig is None or any(
+        name.startswith(_GENERATED_PREFIX) for name in sig.parameters
+    ):
+        return None
+
+    kind = inspect.Parameter
+    arg_list, call_args, defaults, kwdefaults = [], [], [], {}
+    previous_kind = None
+    for name, param in sig.parameters.items():
+        if (
+            previous_kind is kind.POSITIONAL_ONLY
+            and param.kind is not kind.POSITIONAL_ONLY
+        ):
+            arg_list.append("/")
+        if param.kind is kind.KEYWORD_ONLY and previous_kind not in (
+            kind.KEYWORD_ONLY,
+            kind.VAR_POSITIONAL,
+        ):
+            # Keyword-only parameters need a bare '*' in front of them, unless there is a *args.
+            arg_list.append("*")
+        previous_kind = param.kind
+
+        if param.kind is kind.VAR_POSITIONAL:
+            arg_list.append(f"*{name}")
+            call_args.append(f"*{name}")
+        elif param.kind is kind.VAR_KEYWORD:
+            arg_list.append(f"**{name}")
+            call_args.append(f"**{name}")
+        else:
+            # Every default gets a placeholder here; the real values are set on the generated
+            # function below, so we never have to turn a default value into source code.
+            if param.default is kind.empty:
+                arg_list.append(name)
+            elif param.kind is kind.KEYWORD_ONLY:
+                arg_list.append(f"{name}=None")
+                kwdefaults[name] = param.default
+            else:
+                arg_list.append(f"{name}=None")
+                defaults.append(param.default)
+            call_args.append(
+                f"{name}={name}" if param.kind is kind.KEYWORD_ONLY else name
+            )
+    if previous_kind is kind.POSITIONAL_ONLY:
+        arg_list.append("/")
+
+    params_dict = ", ".join(f"{name!r}: {name}" for name in sig.parameters)
+    source = (
+        f"def wrapper({', '.join(arg_list)}):\n"
+        "    _ll_wall = _ll_time()\n"
+        "    _ll_start = _ll_clock()\n"
+        f"    _ll_result = _ll_func({', '.join(call_args)})\n"
+        "    _ll_runtime = _ll_clock() - _ll_start\n"
+        f"    _ll_log_call({{{params_dict}}}, _ll_result, _ll_wall, _ll_runtime)\n"
+        "    return _ll_result\n"
+    )
     try:
-        # Convert the dictionary to a JSON string.
-        json_string = json.dumps(entry)
-        return json_string + "\n"
-    except TypeError as e:
-        # This 'except' catches the failure from `json.dumps`.
-        # This happens if the user's function returned something
-        #   that isn't JSON-friendly (like a model object or a DataFrame).
-        # We re-raise this as our own custom error so the decorator can catch it and handle it gracefully.
-        raise LoggerNonSerializableError(e) from e
+        make_wrapper = _compile_wrapper_factory(source)
+    except SyntaxError:
+        # A hand-written `__signature__` can contain names that aren't valid Python identifiers.
+        return None
+    wrapper = make_wrapper(func, log_call)
+    wrapper.__defaults__ = tuple(defaults) or None
+    wrapper.__kwdefaults__ = kwdefaults or None
+    return wrapper
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_wrapper_factory(
+    wrapper_source: str,
+) -> Callable[[Callable[..., Any], Callable[..., None]], Callable[..., Any]]:
+    """
+    Compiles the source of a generated wrapper into a function that creates such wrappers.
+
+    Compiling is by far the slowest part of decorating a function. Many functions share the same
+    parameters (think of every method taking just `self`), so the compiled code is cached by its source,
+    and decorating another function with the same signature only creates a new function object from it.
+
+    :param wrapper_source: The source of `def wrapper(...)`, as built by `_make_fast_wrapper`.
+    :return: A function taking the decorated function and its `log_call`, and returning a new wrapper.
+    :raises SyntaxError: If the source isn't valid Python.
+    """
+    source = (
+        "def make_wrapper(_ll_func, _ll_log_call):\n"
+        + textwrap.indent(wrapper_source, "    ")
+        + "    return wrapper\n"
+    )
+    namespace: Dict[str, Any] = {
+        "_ll_time": time.time,
+        "_ll_clock": time.perf_counter_ns,
+    }
+    code = compile(source, "<littlelogger wrapper>", "exec")
+    exec(code, namespace)  # pylint: disable=exec-used
+    return namespace["make_wrapper"]
+
+
+@functools.lru_cache(maxsize=1)
+def _format_timestamp(seconds: int) -> bytes:
+    """
+    Formats a UNIX time (in whole seconds) as a UTC timestamp, ready to be put in a log line.
+
+    The timestamp only has a resolution of one second, so every call made within the same second
+    shares the same value. Caching the last one saves us a `strftime` call almost every time.
+
+    :param seconds: Seconds since the epoch.
+    :return: The timestamp, formatted with TIMESTAMP_FORMAT and encoded as ASCII.
+    """
+    return time.strftime(TIMESTAMP_FORMAT, time.gmtime(seconds)).encode("ascii")
+
+
+def _make_serializer(
+    function_name: str, takes_params: bool = True
+) -> Callable[[float, int, Dict[str, Any], Any], bytes]:
+    """
+    Builds the function that converts one call of a decorated function into a JSONL-formatted line.
+
+    JSON-Lines (.jsonl) format requires each log entry to be a single, valid JSON object, followed by a newline.
+    Only the params and the metrics change from one call to the next, so the rest of the line (the keys,
+    the function name, the newline) is encoded once here, and every call just joins the pieces together.
+    This way, we never build a dictionary for the whole entry.
+
+    :param function_name: The name of the decorated function.
+    :param takes_params: False if the function has no parameters. Its params are then always `{}`,
+        so they are encoded once here, together with the keys around them.
+    :return: A function taking the start time, runtime (ns), params and metrics, and returning the line as bytes.
+    """
+    head = b'{"timestamp":"'
+    after_timestamp = (
+        b'","function_name":' + _dumps(function_name) + b',"runtime_seconds":'
+    )
+    if takes_params:
+        after_runtime = b',"params":'
+        after_params = b',"metrics":'
+    else:
+        # The params are always `{}`, so they are part of the fragment, and nothing goes between the two.
+        after_runtime = b',"params":{},"metrics":'
+        after_params = b""
+    tail = b"}\n"
+    runtime_format = f".{RUNTIME_PRECISION}f"
+
+    def serialize(
+        start_time: float, runtime_ns: int, func_args: Dict[str, Any], result: Any
+    ) -> bytes:
+        """
+        Converts one call into a log line.
+
+        :param start_time: When the function was called, as returned by `time.time()`.
+        :param runtime_ns: How long the function took, in nanoseconds.
+        :param func_args: The parameter names mapped to the values the function was called with.
+        :param result: The value returned by the function.
+        :return: The encoded JSON object ending with a newline.
+        """
+        try:
+            # Encode the params and the metrics to JSON bytes (msgspec or orjson if installed, the stdlib otherwise).
+            params = _dumps(func_args) if takes_params else b""
+            metrics = _dumps(result)
+        except (TypeError, ValueError, RecursionError):
+            # msgspec and orjson reject a few values the stdlib json module accepts (orjson can't encode ints
+            # wider than 64 bits, for example). Try again with the stdlib, so these are still logged.
+            try:
+                params = _stdlib_dumps(func_args) if takes_params else b""
+                metrics = _stdlib_dumps(result)
+            except (TypeError, ValueError, RecursionError) as e:
+                # This 'except' catches the failure from the JSON encoder.
+                # This happens if the user's function returned something
+                #   that isn't JSON-friendly (like a model object or a DataFrame).
+                # Data that refers to itself is reported as a `ValueError` (or a `RecursionError`).
+                # We re-raise this as our own custom error so the decorator can catch it and handle it gracefully.
+                # The original error is kept as the cause, and only formatted if the warning is shown.
+                raise LoggerNonSerializableError() from e
+        return b"".join(
+            (
+                head,
+                _format_timestamp(int(start_time)),
+                after_timestamp,
+                # Formatting the number ourselves also takes care of the rounding.
+                format(runtime_ns / 1e9, runtime_format).encode("ascii"),
+                after_runtime,
+                params,
+                after_params,
+                metrics,
+                tail,
+            )
+        )
+
+    return serialize
 
 
-def log_run(log_file: str = DEFAULT_LOG_FILE) -> Callable[..., Any]:
+def _return_unchanged(func: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    The decorator used while logging is disabled: it doesn't wrap the function at all.
+
+    :param func: The function to be decorated.
+    :return: The same function.
+    """
+    return func
+
+
+def log_run(
+    log_file: str = DEFAULT_LOG_FILE,
+    buffered: bool = False,
+    flush_every: Optional[int] = None,
+) -> Callable[..., Any]:
     """
     A decorator factory that logs function calls to the JSONL file.
 
     :param log_file: The path to the .jsonl file for logging., defaults to DEFAULT_LOG_FILE
-    :return: The decorator.
+    :param buffered: If True, log entries are serialized and written in batches by a background thread.
+        Much faster for functions called at a high rate, but the newest lines may not be on disk yet,
+        and logging errors are reported as warnings from that thread.
+        Defaults to False, which writes every line as soon as the function returns.
+    :param flush_every: Only used when `buffered` is True. If set, every Nth call waits until all the entries
+        logged so far are written to the file, which limits how many lines could be lost if the process dies.
+        Smaller values are safer but slower. Defaults to None, which leaves the flushing to the background thread.
+    :return: The decorator. If logging is disabled, it returns functions unchanged.
+    :raises ValueError: If `flush_every` isn't a positive integer, or is given without `buffered=True`.
     """
+    # Unlike logging failures, these are mistakes in how the decorator is used, so we report them right away.
+    if flush_every is not None:
+        if (
+            not isinstance(flush_every, int)
+            or isinstance(flush_every, bool)
+            or flush_every < 1
+        ):
+            raise ValueError(
+                f"flush_every must be a positive integer, got {flush_every!r}."
+            )
+        if not buffered:
+            raise ValueError(
+                "flush_every can only be used together with buffered=True."
+            )
+
+    if _disabled:
+        return _return_unchanged
 
     def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
         """
@@ -82,7 +392,97 @@ def log_run(log_file: str = DEFAULT_LOG_FILE) -> Callable[..., Any]:
         :param func: The function to be decorated.
         :return: The wrapped function.
         """
+        # Look up the writer once, so every call reuses the same open file.
+        writer = get_writer(log_file)
+        # Open the file now, so problems with the path are reported as soon as the function is decorated.
+        try:
+            writer.open()
+        except LoggerWriteError as e:
+            # Never crash the user's script, not even here. Every call will try to open the file again.
+            # 'stacklevel=2' points the warning at the line that applied the decorator.
+            warnings.warn(f"[LittleLogger Warning] {e}", stacklevel=2)
 
+        # Inspecting the signature is expensive, so we do it once here instead of on every call.
+        try:
+            sig = inspect.signature(func)
+        except (TypeError, ValueError):
+            sig = None
+        # The specialized wrapper (and everything that relies on its exact parameters) needs a signature
+        # that matches the function's own code. Other functions get the generic wrapper.
+        own_sig = sig if _has_own_signature(func) else None
+
+        # Without such a signature we can't tell if there are parameters, so the params are always encoded.
+        serialize = _make_serializer(
+            func.__name__, takes_params=own_sig is None or bool(own_sig.parameters)
+        )
+        # Look up the writer's methods once, rather than on every call.
+        write_line = writer.write
+        submit_entry = writer.submit
+
+        def log_call(
+            func_args: Dict[str, Any], result: Any, start_time: float, runtime_ns: int
+        ) -> None:
+            """
+            Writes the log line for one call to the log file.
+
+            Everything that is only needed for the log (like formatting the timestamp) happens here,
+            rather than around the call to the user's function.
+
+            :param func_args: The parameter names mapped to the values the function was called with.
+            :param result: The value returned by the function.
+            :param start_time: When the function was called, as returned by `time.time()`.
+            :param runtime_ns: How long the function took, in nanoseconds.
+            """
+            # try to write this log to the file. This whole section is wrapped in a 'try...except'
+            # so that if logging fails, it won't crash the user's script.
+            try:
+                # Convert the call to a line of JSON bytes, and write it (the writer keeps the file open).
+                write_line(serialize(start_time, runtime_ns, func_args, result))
+
+            except (LoggerNonSerializableError, LoggerWriteError) as e:
+                # NOTE: MOST IMPORTANT RULE: Never crash the user's script.
+                # If logging failed (for any reason), we just
+                # show a warning and let the user's script continue.
+
+                # 'stacklevel=3' tells the warning to point to the
+                # line in the user's code that called the wrapper,
+                # which is much more helpful for debugging.
+                warnings.warn(f"[LittleLogger Warning] {e}", stacklevel=3)
+
+        def log_call_buffered(
+            func_args: Dict[str, Any], result: Any, start_time: float, runtime_ns: int
+        ) -> None:
+            """
+            Same as `log_call`, but the background thread serializes and writes the entry,
+            so the caller never waits for either.
+            """
+            submit_entry(serialize, (start_time, runtime_ns, func_args, result))
+
+        # Counts the calls for `log_call_flushing`, separately for every decorated function.
+        call_count = itertools.count(1)
+
+        def log_call_flushing(
+            func_args: Dict[str, Any], result: Any, start_time: float, runtime_ns: int
+        ) -> None:
+            """
+            Same as `log_call_buffered`, but every `flush_every` calls it waits for the entries to be written.
+            """
+            submit_entry(serialize, (start_time, runtime_ns, func_args, result))
+            if next(call_count) % flush_every == 0:
+                flush_all()
+
+        if buffered and flush_every is not None:
+            log_call = log_call_flushing
+        elif buffered:
+            log_call = log_call_buffered
+
+        fast_wrapper = _make_fast_wrapper(func, own_sig, log_call)
+        if fast_wrapper is not None:
+            return functools.wraps(func)(fast_wrapper)
+
+        # The signature couldn't be inspected (e.g. some built-in functions) or belongs to a function
+        # wrapped by another decorator, so we fall back to a generic wrapper that works out the argument
+        # names on every call.
         @functools.wraps(func)
         def wrapper(*args: Any, **kwargs: Any) -> Any:
             """
@@ -95,10 +495,12 @@ def log_run(log_file: str = DEFAULT_LOG_FILE) -> Callable[..., Any]:
             :param kwargs: Keyword arguments passed to the wrapped function.
             :return: The original return value of the wrapped function.
             """
-            start_time = time.perf_counter()
+            # Wall-clock time for the timestamp, and a monotonic counter for measuring the runtime.
+            start_time = time.time()
+            start_counter = time.perf_counter_ns()
 
             # We do this before running the function, just in case the function itself fails.
-            func_args = _get_func_args(func, *args, **kwargs)
+            func_args = _get_func_args(func, sig, args, kwargs)
 
             try:
                 # Run the user's original function
@@ -106,47 +508,9 @@ def log_run(log_file: str = DEFAULT_LOG_FILE) -> Callable[..., Any]:
             finally:
                 # A 'finally' block always runs, even if the function in the 'try' block crashed.
                 # This guarantees we always log how long it took.
-                end_time = time.perf_counter()
-                runtime = end_time - start_time
-
-            # Put all the log information into a dictionary
-            log_entry = {
-                "timestamp": time.strftime(TIMESTAMP_FORMAT, time.gmtime()),
-                "function_name": func.__name__,
-                "runtime_seconds": round(runtime, RUNTIME_PRECISION),
-                "params": func_args,
-                "metrics": result,
-            }
-
-            # try to write this log to the file. This whole section is wrapped in a 'try...except'
-            # so that if logging fails, it won't crash the user's script.
-            try:
-                # Convert the dictionary to a JSON string
-                json_string = _serialize_log_entry(log_entry)
-
-                try:
-                    with open(
-                        # 'a' means "append" (add to the end of the file).
-                        # 'utf-8' is a standard text format.
-                        log_file,
-                        "a",
-                        encoding="utf-8",
-                    ) as f:
-                        f.write(json_string)
-                except (IOError, OSError) as e:
-                    # This catches file system errors, like if the disk is full or we don't have permission to write.
-                    raise LoggerWriteError(f"Failed to write log to file: {e}") from e
-
-            except (LoggerNonSerializableError, LoggerWriteError) as e:
-                # NOTE: MOST IMPORTANT RULE: Never crash the user's script.
-                # If logging failed (for any reason), we just
-                # show a warning and let the user's script continue.
-
-                # 'stacklevel=2' tells the warning to point to the
-                # line in the user's code that called this function,
-                # which is much more helpful for debugging.
-                warnings.warn(f"[LittleLogger Warning] {e}", stacklevel=2)
+                runtime_ns = time.perf_counter_ns() - start_counter
 
+            log_call(func_args, result, start_time, runtime_ns)
             return result
 
         return wrapper
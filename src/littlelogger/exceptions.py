@@ -26,11 +26,16 @@ class LoggerNonSerializableError(TypeError, LoggerError):
 
 
     def __init__(self, original_error: Exception = None):
+        super().__init__(self.DEFAULT_MESSAGE)
+        self.original_error = original_error
+
+    def __str__(self) -> str:
+        # The full message is only put together when the error is actually displayed.
+        # If no original error was passed, fall back to the one this error was raised from.
+        original_error = self.original_error or self.__cause__
         if original_error:
-            message = f"{self.DEFAULT_MESSAGE} Original error: {original_error}"
-        else:
-            message = self.DEFAULT_MESSAGE
-        super().__init__(message)
+            return f"{self.DEFAULT_MESSAGE} Original error: {original_error}"
+        return self.DEFAULT_MESSAGE
 
 
 class LoggerWriteError(IOError, LoggerError):
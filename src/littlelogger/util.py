@@ -3,18 +3,28 @@ This module will house all the utility functions that would be used along with l
 """
 
 from pathlib import Path
-from typing import Union
+from typing import TYPE_CHECKING, Union
 
-import pandas as pd
+from .writer import flush_all
 
+if TYPE_CHECKING:
+    import pandas as pd
 
-def load_log(log_file_path: Union[str, Path]) -> pd.DataFrame:
+
+def load_log(log_file_path: Union[str, Path]) -> "pd.DataFrame":
     """
     Load and normalize the provided LittleLogger JSONL log file.
 
     :param log_file_path: Path to the log file
     :return: Pandas dataframe containing the log file in a normalized format
     """
+    # pandas takes a long time to import, so we only import it when a log is actually loaded.
+    # This way, `import littlelogger` (and decorating functions) never pays for it.
+    import pandas as pd  # pylint: disable=import-outside-toplevel
+
+    # Make sure lines still waiting in a buffered writer are on disk before we read the file.
+    flush_all()
+
     df = pd.read_json(log_file_path, lines=True)
 
     # Use json_normalize and then add_prefix
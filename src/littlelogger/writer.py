@@ -0,0 +1,342 @@
+"""
+Persistent, per-file writers that the decorator hands its log lines to
+"""
+
+import atexit
+import os
+import queue
+import threading
+import time
+import warnings
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .constants import (
+    BUFFER_FLUSH_BYTES,
+    BUFFER_FLUSH_INTERVAL_SECONDS,
+    FILE_CHECK_INTERVAL_SECONDS,
+)
+from .exceptions import LoggerWriteError
+
+# Flags for opening a log file. O_APPEND makes the kernel move to the end of the file on every write, so we
+# never overwrite lines appended by someone else in the meantime. O_BINARY stops Windows from translating "\n".
+_OPEN_FLAGS: int = os.O_WRONLY | os.O_CREAT | os.O_APPEND | getattr(os, "O_BINARY", 0)
+
+
+class _LogWriter:
+    """
+    Owns one log file: a file descriptor that stays open between calls and a buffer of lines waiting to be written.
+
+    Opening and closing the file for every single log line is the most expensive part of logging a fast
+    function. Instead, the file is opened once and lines are appended to an in-memory buffer, which we write
+    out in a single call. We write to the raw descriptor with `os.write`, since the lines are already encoded
+    and a Python file object would only add its own buffering and locking on top.
+    """
+
+    def __init__(self, path: str) -> None:
+        # `path` is absolute, so changing the working directory later doesn't matter.
+        self.path = path
+        self._fd: Optional[int] = None
+        self._pending = bytearray()
+        # When to next check that `_fd` is still the file at `path` (see `_check_file_locked`).
+        self._next_file_check = 0.0
+        # Guards the buffer and the handle so that lines are written in the order they were logged.
+        self._lock = threading.Lock()
+
+    def write(self, log_line: bytes) -> None:
+        """
+        Writes a line to the log file right away.
+
+        :param log_line: The encoded log line, newline included.
+        :raises LoggerWriteError: If the line couldn't be written to the file.
+        """
+        # The lock keeps lines from different threads from being mixed up (POSIX doesn't promise that
+        # writes to a regular file are atomic), and the file from being closed while we write to it.
+        with self._lock:
+            self._check_file_locked()
+            if self._fd is not None and not self._pending:
+                # Usually the whole line goes out in one call, without copying it into the buffer first.
+                try:
+                    written = os.write(self._fd, log_line)
+                except OSError as e:
+                    raise LoggerWriteError(f"Failed to write log to file: {e}") from e
+                if written == len(log_line):
+                    return
+                log_line = log_line[written:]
+            self._pending += log_line
+            self._flush_locked()
+
+    def submit(self, serialize: Callable[..., bytes], entry: Tuple[Any, ...]) -> None:
+        """
+        Hands an entry to the background thread, which serializes and writes it later.
+
+        The caller doesn't wait for either, and errors are reported as warnings from the background thread.
+
+        :param serialize: Turns the entry into an encoded log line, newline included.
+        :param entry: The arguments to call `serialize` with.
+        """
+        _LOG_QUEUE.put((self, serialize, entry))
+        _ensure_worker_started()
+
+    def open(self) -> None:
+        """
+        Opens the log file if it isn't open yet (or was deleted or moved away since it was opened),
+        creating it (and the folders it lives in) when needed.
+
+        This is done when a function is decorated, so problems like a missing permission show up right away
+        and the first call doesn't have to open the file. If it fails, the next write simply tries again.
+
+        :raises LoggerWriteError: If the file couldn't be opened.
+        """
+        with self._lock:
+            try:
+                self._check_file_locked(force=True)
+                self._open_locked()
+            except OSError as e:
+                raise LoggerWriteError(f"Failed to open log file: {e}") from e
+
+    def flush(self) -> None:
+        """
+        Writes every pending line to the file.
+
+        :raises LoggerWriteError: If the lines couldn't be written to the file.
+        """
+        with self._lock:
+            self._flush_locked()
+
+    def close(self) -> None:
+        """
+        Flushes the pending lines and closes the file descriptor.
+
+        :raises LoggerWriteError: If the lines couldn't be written to the file.
+        """
+        with self._lock:
+            try:
+                self._flush_locked()
+            finally:
+                if self._fd is not None:
+                    os.close(self._fd)
+                    self._fd = None
+
+    def append(self, log_line: bytes) -> int:
+        """
+        Adds a line to the buffer without writing it. Used by the background thread.
+
+        :param log_line: The encoded log line, newline included.
+        :return: How many bytes are now waiting to be written.
+        """
+        with self._lock:
+            self._pending += log_line
+            return len(self._pending)
+
+    def _open_locked(self) -> None:
+        """
+        Opens the file descriptor if needed. The caller must hold `self._lock`.
+
+        :raises OSError: If the folder or the file couldn't be created or opened.
+        """
+        if self._fd is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            # We never fsync: the lines are handed to the OS, which writes them out in its own time.
+            self._fd = os.open(self.path, _OPEN_FLAGS, 0o644)
+
+    def _check_file_locked(self, force: bool = False) -> None:
+        """
+        Closes the file descriptor if the log file was deleted or replaced (e.g. by log rotation)
+        since it was opened, so that the next write creates the file at `path` again.
+
+        Otherwise, every later line would go to a file that no longer has a name, and be lost.
+        Checking costs two system calls, so it's only done every FILE_CHECK_INTERVAL_SECONDS.
+        The caller must hold `self._lock`.
+
+        :param force: Check right away, however recently the file was last checked.
+        """
+        if self._fd is None:
+            return
+        now = time.monotonic()
+        if not force and now < self._next_file_check:
+            return
+        self._next_file_check = now + FILE_CHECK_INTERVAL_SECONDS
+        try:
+            path_stat = os.stat(self.path)
+            fd_stat = os.fstat(self._fd)
+            if (path_stat.st_dev, path_stat.st_ino) == (fd_stat.st_dev, fd_stat.st_ino):
+                return
+        except OSError:
+            # The file is gone (or the descriptor is broken): open it again, too.
+            pass
+        try:
+            os.close(self._fd)
+        except OSError:
+            pass
+        self._fd = None
+
+    def _flush_locked(self) -> None:
+        """
+        Writes out the buffer. The caller must hold `self._lock`.
+        """
+        if not self._pending:
+            return
+        try:
+            self._check_file_locked()
+            self._open_locked()
+            data = self._pending
+            while data:
+                # A write may accept only part of the data, so keep going until it's all written.
+                data = data[os.write(self._fd, data) :]
+        except (IOError, OSError) as e:
+            # This catches file system errors, like if the disk is full or we don't have permission to write.
+            raise LoggerWriteError(f"Failed to write log to file: {e}") from e
+        finally:
+            # Best-effort logging: we never retry, so the lines are dropped even if the write failed.
+            self._pending.clear()
+
+
+# One writer per log file (keyed by absolute path), shared by every decorated function logging to it.
+_WRITERS: Dict[str, _LogWriter] = {}
+_WRITERS_LOCK = threading.Lock()
+
+# Entries submitted by buffered loggers, waiting for the background thread. Besides (writer, serialize, entry)
+# tuples, it can hold a `threading.Event` (flush everything, then set the event) or `_STOP` (flush and exit).
+_LOG_QUEUE: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+_STOP = object()
+_worker: Optional[threading.Thread] = None
+
+
+def get_writer(path: str) -> _LogWriter:
+    """
+    Returns the writer for a log file, creating it the first time the file is seen.
+
+    :param path: The path to the .jsonl log file.
+    :return: The writer shared by everyone logging to that path.
+    """
+    path = os.path.abspath(path)
+    writer = _WRITERS.get(path)
+    if writer is None:
+        with _WRITERS_LOCK:
+            writer = _WRITERS.setdefault(path, _LogWriter(path))
+    return writer
+
+
+def flush_all() -> None:
+    """
+    Writes out every submitted entry and pending line, for every log file.
+
+    Blocks until the background thread has caught up, so the log files are complete when this returns.
+    """
+    if _worker is not None and _worker.is_alive():
+        done = threading.Event()
+        _LOG_QUEUE.put(done)
+        done.wait()
+    else:
+        _flush_writers()
+
+
+def _flush_writers() -> None:
+    """
+    Writes out the pending lines of every log file.
+
+    Failures are reported as warnings, since this runs in the background and at interpreter exit.
+    """
+    for writer in list(_WRITERS.values()):
+        try:
+            writer.flush()
+        except LoggerWriteError as e:
+            warnings.warn(f"[LittleLogger Warning] {e}", stacklevel=2)
+
+
+def _close_all() -> None:
+    """
+    Stops the background thread, then flushes and closes every log file.
+
+    Registered to run when the interpreter exits.
+    """
+    if _worker is not None and _worker.is_alive():
+        _LOG_QUEUE.put(_STOP)
+        _worker.join()
+    for writer in list(_WRITERS.values()):
+        try:
+            writer.close()
+        except LoggerWriteError as e:
+            warnings.warn(f"[LittleLogger Warning] {e}", stacklevel=2)
+
+
+def _drain_loop() -> None:
+    """
+    Body of the background thread: serializes submitted entries and writes them out in batches.
+
+    Lines are collected in each writer's buffer, and written with a single call once the buffer is full,
+    once BUFFER_FLUSH_INTERVAL_SECONDS have passed, or as soon as the queue goes quiet.
+    """
+    last_flush = time.monotonic()
+    while True:
+        try:
+            item = _LOG_QUEUE.get(timeout=BUFFER_FLUSH_INTERVAL_SECONDS)
+        except queue.Empty:
+            item = None
+
+        if item is _STOP:
+            _flush_writers()
+            return
+        if isinstance(item, threading.Event):
+            _flush_writers()
+            item.set()
+            continue
+
+        if item is not None:
+            writer, serialize, entry = item
+            try:
+                if writer.append(serialize(*entry)) >= BUFFER_FLUSH_BYTES:
+                    writer.flush()
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                # NOTE: Never crash, not even in the background. If this thread died, every later entry
+                # would be silently lost. So whatever went wrong, warn and move on to the next entry.
+                warnings.warn(f"[LittleLogger Warning] {e}")
+
+        if (
+            item is None
+            or time.monotonic() - last_flush >= BUFFER_FLUSH_INTERVAL_SECONDS
+        ):
+            _flush_writers()
+            last_flush = time.monotonic()
+
+
+def _ensure_worker_started() -> None:
+    """
+    Starts the background thread the first time a buffered entry is submitted,
+    or again if it has stopped (e.g. after `_close_all`).
+    """
+    global _worker  # pylint: disable=global-statement
+    if _worker is not None and _worker.is_alive():
+        return
+    with _WRITERS_LOCK:
+        if _worker is None or not _worker.is_alive():
+            # A daemon thread never keeps the interpreter alive; `_close_all` stops it and flushes what's left.
+            _worker = threading.Thread(
+                target=_drain_loop, name="littlelogger-writer", daemon=True
+            )
+            _worker.start()
+
+
+def _reset_after_fork() -> None:
+    """
+    Gives a forked child process its own, empty logging state.
+
+    The child starts with copies of the parent's queue and buffers, but without the background thread.
+    Left alone, the child's buffered entries would never be written, and lines the parent hadn't written
+    yet would be written by both processes. The open file descriptors are kept: they are shared with the
+    parent, and O_APPEND keeps both processes' lines at the end of the file.
+    """
+    global _LOG_QUEUE, _WRITERS_LOCK, _worker  # pylint: disable=global-statement
+    _LOG_QUEUE = queue.SimpleQueue()
+    _WRITERS_LOCK = threading.Lock()
+    _worker = None
+    for writer in _WRITERS.values():
+        # The parent's lock may have been held by a thread that doesn't exist in the child.
+        writer._lock = threading.Lock()  # pylint: disable=protected-access
+        writer._pending = bytearray()  # pylint: disable=protected-access
+
+
+atexit.register(_close_all)
+if hasattr(os, "register_at_fork"):
+    # Not available on Windows, which has no fork.
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -2,14 +2,21 @@
 Tests for the littlelogger package.
 """
 
+import datetime
+import functools
+import importlib
 import json
+import os
+import re
 from pathlib import Path
-from unittest.mock import mock_open, patch
+from unittest.mock import patch
 
 import pandas as pd
 import pytest
 
-from littlelogger import log_run
+import littlelogger
+from littlelogger import load_log, log_run
+from littlelogger.writer import flush_all
 
 
 @pytest.fixture(name="clean_log_file")
@@ -98,21 +105,25 @@ def test_logging_failure_does_not_crash():
     CRITICAL: Test that if logging fails, the user's function
     still returns its value and a warning is issued.
     """
-    # We patch `open` to raise a PermissionError when called.
-    # This simulates a file system error.
-    with patch("builtins.open", mock_open()) as mock_file:
-        mock_file.side_effect = PermissionError("Permission denied")
+    # We patch `os.open` (which the writer uses to open the log file) to raise
+    # a PermissionError when called. This simulates a file system error.
+    with patch("os.open") as mock_os_open:
+        mock_os_open.side_effect = PermissionError("Permission denied")
 
-        # We must use `pytest.warns` to check that our warning was issued.
+        # We must use `pytest.warns` to check that our warnings were issued.
 
-        # The original `match="Failed to log run"` was wrong.
-        # We update it to match the actual warning text.
-        with pytest.warns(UserWarning, match="Failed to write log to file"):
+        # The file is opened when the function is decorated, so the first
+        # warning comes from there.
+        with pytest.warns(UserWarning, match="Failed to open log file"):
 
             @log_run(log_file="any_file.jsonl")
             def model(x):
                 return x * 2
 
+        # Every call tries to open the file again, and warns when it can't.
+        # The original `match="Failed to log run"` was wrong.
+        # We update it to match the actual warning text.
+        with pytest.warns(UserWarning, match="Failed to write log to file"):
             result = model(10)
 
     # The most important part: the original function's value
@@ -140,3 +151,382 @@ def test_non_serializable_metrics_does_not_crash(clean_log_file):
     # The log file should be empty, as the write failed
     log_path = Path(clean_log_file)
     assert not log_path.exists() or log_path.read_text(encoding="utf-8") == ""
+
+
+def test_buffered_runs_are_flushed_before_loading(clean_log_file):
+    """
+    Test that lines held back by a buffered logger are all written
+    out (in order) by the time the log is loaded.
+    """
+
+    @log_run(log_file=clean_log_file, buffered=True)
+    def model(val):
+        return {"val": val}
+
+    for val in range(5):
+        model(val)
+
+    df = load_log(clean_log_file)
+    assert df["metric_val"].tolist() == [0, 1, 2, 3, 4]
+    assert df["param_val"].tolist() == [0, 1, 2, 3, 4]
+
+
+def test_log_all_parameter_kinds(clean_log_file):
+    """
+    Test that positional-only, keyword-only, *args and **kwargs
+    parameters are all logged under their own names.
+    """
+
+    # A default before *args is exactly one of the parameter kinds under test.
+    # pylint: disable=keyword-arg-before-vararg
+    @log_run(log_file=clean_log_file)
+    def model(a, /, b=2, *args, c, d=4, **kwargs):
+        return {"metric": a + b + c + d + sum(args) + sum(kwargs.values())}
+
+    model(1, 2, 3, c=3, e=5)
+
+    with open(clean_log_file, "r", encoding="utf-8") as f:
+        data = json.loads(f.readline())
+
+    assert data["params"] == {
+        "a": 1,
+        "b": 2,
+        "args": [3],
+        "c": 3,
+        "d": 4,
+        "kwargs": {"e": 5},
+    }
+    assert data["metrics"] == {"metric": 18}
+
+
+def test_log_file_created_at_decoration_time(tmp_path):
+    """
+    Test that the log file (and any missing folders) are created as soon
+    as the function is decorated, before it is ever called.
+    """
+    log_path = tmp_path / "nested" / "test_log.jsonl"
+
+    @log_run(log_file=str(log_path))
+    def model(x):
+        return {"y": x}
+
+    assert log_path.exists()
+    assert log_path.read_text(encoding="utf-8") == ""
+
+
+def test_buffered_flush_every_writes_without_loading(clean_log_file):
+    """
+    Test that with `flush_every`, every Nth call waits for the buffered
+    lines to be written, without needing `load_log` to flush them.
+    """
+
+    @log_run(log_file=clean_log_file, buffered=True, flush_every=2)
+    def model(val):
+        return {"val": val}
+
+    model(1)
+    model(2)
+
+    with open(clean_log_file, "r", encoding="utf-8") as f:
+        lines = f.readlines()
+
+    assert [json.loads(line)["metrics"]["val"] for line in lines] == [1, 2]
+
+
+def test_disabled_logging_returns_function_unchanged(clean_log_file):
+    """
+    Test that while logging is disabled, functions are not wrapped
+    and nothing is written.
+    """
+
+    def model(x):
+        return {"y": x}
+
+    littlelogger.disable()
+    try:
+        decorated = log_run(log_file=clean_log_file)(model)
+    finally:
+        littlelogger.enable()
+
+    assert decorated is model
+    assert decorated(1) == {"y": 1}
+    assert not Path(clean_log_file).exists()
+
+
+def test_functions_with_same_signature_log_their_own_defaults(clean_log_file):
+    """
+    Test that two functions with the same parameters, which share the
+    compiled wrapper code, still keep their own defaults and names.
+    """
+
+    @log_run(log_file=clean_log_file)
+    def first(x, y=1):
+        return {"result": x + y}
+
+    @log_run(log_file=clean_log_file)
+    def second(x, y=5):
+        return {"result": x * y}
+
+    assert first(2) == {"result": 3}
+    assert second(2) == {"result": 10}
+
+    df = load_log(clean_log_file)
+    assert df["function_name"].tolist() == ["first", "second"]
+    assert df["param_y"].tolist() == [1, 5]
+
+
+def test_signature_changing_decorator_does_not_crash(clean_log_file):
+    """
+    Test that a function wrapped by another decorator (one that accepts
+    extra parameters) can still be called with those parameters.
+    """
+
+    def with_retry(func):
+        @functools.wraps(func)
+        def inner(*args, retries=3, **kwargs):
+            return {**func(*args, **kwargs), "retries": retries}
+
+        return inner
+
+    @log_run(log_file=clean_log_file)
+    @with_retry
+    def train(x):
+        return {"y": x}
+
+    # `retries` isn't a parameter of `train`, so the arguments can't be
+    # matched to its signature and are logged in their raw form.
+    with pytest.warns(UserWarning, match="Could not figure out argument names"):
+        # `retries` is added by `with_retry`, which pylint can't see.
+        result = train(1, retries=5)  # pylint: disable=unexpected-keyword-arg
+
+    assert result == {"y": 1, "retries": 5}
+
+    with open(clean_log_file, "r", encoding="utf-8") as f:
+        data = json.loads(f.readline())
+
+    assert data["params"] == {"_args": [1], "_kwargs": {"retries": 5}}
+    assert data["metrics"] == {"y": 1, "retries": 5}
+
+
+def test_buffered_logging_survives_unencodable_entry(clean_log_file):
+    """
+    Test that an entry the JSON encoder chokes on (here, data that refers
+    to itself) only produces a warning, and later entries are still written.
+    """
+
+    @log_run(log_file=clean_log_file, buffered=True)
+    def model(val):
+        metrics = {"val": val}
+        if val == 1:
+            metrics["self"] = metrics
+        return metrics
+
+    with pytest.warns(UserWarning, match="Failed to serialize"):
+        model(1)
+        model(2)
+        df = load_log(clean_log_file)
+
+    assert df["metric_val"].tolist() == [2]
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+def test_buffered_logging_after_fork(clean_log_file):
+    """
+    Test that a forked child writes its own buffered entries, and doesn't
+    write the lines its parent logged before the fork a second time.
+    """
+
+    @log_run(log_file=clean_log_file, buffered=True)
+    def model(val):
+        return {"val": val}
+
+    model(0)
+    pid = os.fork()
+    if pid == 0:
+        # The child must never return into pytest, whatever happens.
+        try:
+            model(1)
+            flush_all()
+        finally:
+            os._exit(0)  # pylint: disable=protected-access
+    os.waitpid(pid, 0)
+
+    df = load_log(clean_log_file)
+    assert sorted(df["metric_val"].tolist()) == [0, 1]
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"buffered": True, "flush_every": 0},
+        {"buffered": True, "flush_every": -1},
+        {"buffered": True, "flush_every": 1.5},
+        {"buffered": False, "flush_every": 2},
+    ],
+)
+def test_invalid_flush_every_is_rejected(clean_log_file, kwargs):
+    """
+    Test that `flush_every` must be a positive integer, and is only
+    accepted together with `buffered=True`.
+    """
+    with pytest.raises(ValueError, match="flush_every"):
+        log_run(log_file=clean_log_file, **kwargs)
+
+
+def test_wide_integers_are_logged(clean_log_file):
+    """
+    Test that integers too wide for the fast JSON encoders are still
+    logged, whichever encoder is installed.
+    """
+
+    @log_run(log_file=clean_log_file)
+    def model(seed):
+        return {"big": 2**70, "seed_bits": seed.bit_length()}
+
+    model(2**65)
+
+    with open(clean_log_file, "r", encoding="utf-8") as f:
+        data = json.loads(f.readline())
+
+    assert data["params"] == {"seed": 2**65}
+    assert data["metrics"] == {"big": 2**70, "seed_bits": 66}
+
+
+def test_disable_env_var_returns_function_unchanged(clean_log_file, monkeypatch):
+    """
+    Test that setting LITTLELOGGER_DISABLE=1 before the package is
+    imported turns logging off.
+    """
+
+    def model(x):
+        return {"y": x}
+
+    monkeypatch.setenv("LITTLELOGGER_DISABLE", "1")
+    decorator_module = importlib.reload(littlelogger.decorator)
+    try:
+        assert decorator_module.log_run(log_file=clean_log_file)(model) is model
+    finally:
+        monkeypatch.delenv("LITTLELOGGER_DISABLE")
+        importlib.reload(littlelogger.decorator)
+
+    assert littlelogger.decorator.log_run(log_file=clean_log_file)(model) is not model
+
+
+def test_log_line_for_function_without_parameters(clean_log_file):
+    """
+    Test the exact log line written for a function that takes no
+    parameters, whose params are always an empty dictionary.
+    """
+
+    @log_run(log_file=clean_log_file)
+    def model():
+        return [1, 2]
+
+    model()
+
+    with open(clean_log_file, "rb") as f:
+        log_line = f.read()
+
+    assert re.fullmatch(
+        rb'\{"timestamp":"\d{4}-\d\d-\d\dT\d\d:\d\d:\d\dZ","function_name":"model",'
+        rb'"runtime_seconds":\d+\.\d{6},"params":\{\},"metrics":\[1, ?2\]\}\n',
+        log_line,
+    )
+
+
+def test_deleted_log_file_is_created_again(clean_log_file):
+    """
+    Test that if the log file is deleted (or rotated away), decorating
+    a function again creates it, and new lines are written to it.
+    """
+
+    @log_run(log_file=clean_log_file)
+    def model(val):
+        return {"val": val}
+
+    model(1)
+    Path(clean_log_file).unlink()
+
+    @log_run(log_file=clean_log_file)
+    def model_again(val):
+        return {"val": val}
+
+    model_again(2)
+
+    with open(clean_log_file, "r", encoding="utf-8") as f:
+        lines = f.readlines()
+
+    assert [json.loads(line)["metrics"]["val"] for line in lines] == [2]
+
+
+def test_generic_wrapper_logs_arguments_named_like_its_own(clean_log_file):
+    """
+    Test that keyword arguments called `sig` or `func` are logged like any
+    other on the generic wrapper (used for functions under another decorator).
+    """
+
+    def passthrough(func):
+        @functools.wraps(func)
+        def inner(*args, **kwargs):
+            return func(*args, **kwargs)
+
+        return inner
+
+    @log_run(log_file=clean_log_file)
+    @passthrough
+    def train(sig, func, lr):
+        return {"total": sig + func + lr}
+
+    assert train(sig=2, func=3, lr=0.5) == {"total": 5.5}
+
+    with open(clean_log_file, "r", encoding="utf-8") as f:
+        data = json.loads(f.readline())
+
+    assert data["params"] == {"sig": 2, "func": 3, "lr": 0.5}
+
+
+def _installed_encoder():
+    """
+    Returns the name of the JSON encoder littlelogger picks, in the same order it tries them.
+    """
+    for name in ("msgspec", "orjson"):
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            continue
+        return name
+    return "json"
+
+
+@pytest.mark.parametrize(
+    "value, logged_by",
+    [
+        # Logged by both fast encoders (as an ISO 8601 string), but not by the stdlib.
+        (
+            datetime.datetime(2025, 1, 2, 3, 4, 5),
+            {"msgspec": "2025-01-02T03:04:05", "orjson": "2025-01-02T03:04:05"},
+        ),
+        # Logged by msgspec only (as base64).
+        (b"hi", {"msgspec": "aGk="}),
+    ],
+)
+def test_logged_types_depend_on_encoder(clean_log_file, value, logged_by):
+    """
+    Test the documented differences between the JSON encoders: a value
+    is either logged in the expected form, or dropped with a warning.
+    """
+
+    @log_run(log_file=clean_log_file)
+    def model():
+        return {"value": value}
+
+    encoder = _installed_encoder()
+    if encoder in logged_by:
+        model()
+        with open(clean_log_file, "r", encoding="utf-8") as f:
+            data = json.loads(f.readline())
+        assert data["metrics"] == {"value": logged_by[encoder]}
+    else:
+        with pytest.warns(UserWarning, match="Failed to serialize"):
+            model()
+        assert Path(clean_log_file).read_text(encoding="utf-8") == ""